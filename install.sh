@@ -83,6 +83,8 @@ apt-get update
 # Install required packages
 apt-get install -y \
     python3-flask \
+    python3-dbus-next \
+    gunicorn \
     python3-pip \
     dnsmasq \
     iptables
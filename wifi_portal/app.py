@@ -5,26 +5,106 @@ Flask web server providing captive portal for WiFi setup
 """
 
 from flask import Flask, render_template, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import subprocess
 import os
 import sys
 import json
 import re
+import threading
+import time
+import csv
+import asyncio
+import heapq
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from operator import itemgetter
+from pathlib import Path
+
+try:
+    from dbus_next import BusType, Message, MessageType
+    from dbus_next.aio import MessageBus
+except ImportError:
+    MessageBus = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 
+
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """JSON provider that serializes responses with orjson"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+
 # Path to the WiFi configuration script
-SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'scripts')
-CONFIGURE_WIFI_SCRIPT = os.path.join(SCRIPTS_DIR, 'configure_wifi.sh')
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = BASE_DIR / 'scripts'
+CONFIGURE_WIFI_SCRIPT = str(SCRIPTS_DIR / 'configure_wifi.sh')
 AP_CONNECTION_NAME = "WiFi-Setup-AP"
 
+# Scan results are reused for a few seconds so that repeated polls from the
+# portal page don't each trigger a full nmcli radio scan
+_SCAN_TTL = 8.0
+_SCAN_CACHE = {"ts": 0.0, "data": None}
+_SCAN_LOCK = threading.Lock()
+# Scan currently running, shared by every request that arrives meanwhile
+_SCAN_INFLIGHT = {"future": None, "rescan": False}
+# How long a request waits for another request's scan before giving up
+_SCAN_JOIN_TIMEOUT = 15.0
+
+# Only the strongest networks are listed; crowded areas can show 40+ APs
+SCAN_RESULT_LIMIT = 25
+SCAN_MIN_SIGNAL = 10
+# How long /rescan waits for NetworkManager to finish a new scan
+SCAN_WAIT_TIMEOUT = 10.0
+
+# Follow-up of the configuration started by /configure: wait for the
+# connection, then take the setup AP down. Every /configure bumps "gen", so
+# timers left over from an earlier attempt do nothing.
+CONFIG_LOG_FILE = "/var/log/wifi-config.log"
+CONNECT_WAIT = 30.0
+AP_SHUTDOWN_DELAY = 5.0
+_CONFIG_LOCK = threading.Lock()
+_CONFIG_STATE = {"gen": 0, "timer": None}
+
+# Last /status result, kept until `nmcli monitor` reports a network change.
+# "gen" is bumped on every change so a read that raced with one isn't stored.
+_STATUS_LOCK = threading.Lock()
+# The snapshot is also re-read after _STATUS_MAX_AGE seconds, which bounds
+# how long a change missed while the monitor was starting can go unseen.
+_STATUS_CACHE = {"gen": 0, "data": None, "ts": 0.0}
+_STATUS_MAX_AGE = 30.0
+_status_monitor = {"started": False, "alive": False}
+
+# NetworkManager D-Bus API, used when dbus-next is installed
+NM_BUS_NAME = 'org.freedesktop.NetworkManager'
+NM_PATH = '/org/freedesktop/NetworkManager'
+NM_IFACE = 'org.freedesktop.NetworkManager'
+NM_DEVICE_TYPE_WIFI = 2
+NM_AP_FLAGS_PRIVACY = 0x1
+NM_ACTIVE_CONNECTION_STATE_ACTIVATED = 2
+
+_DBUS_LOCK = threading.Lock()
+_dbus_bus = None
+_dbus_loop = None
+_dbus_failed = False
+
 
 def run_command(cmd, timeout=30):
-    """Run a shell command and return output"""
+    """Run a command given as an argv list and return output"""
     try:
         result = subprocess.run(
             cmd,
-            shell=True,
             capture_output=True,
             text=True,
             timeout=timeout
@@ -36,49 +116,243 @@ def run_command(cmd, timeout=30):
         return -1, "", str(e)
 
 
-def get_available_networks():
-    """Scan for available WiFi networks"""
-    code, stdout, stderr = run_command("nmcli -t -f SSID,SIGNAL,SECURITY device wifi list")
+def _parse_terse(output):
+    r"""Split nmcli -t output into fields, honouring its \: and \\ escapes"""
+    return csv.reader(
+        output.splitlines(),
+        delimiter=':',
+        escapechar='\\',
+        quoting=csv.QUOTE_NONE
+    )
+
+
+def _get_dbus():
+    """Return the shared system bus connection, or None to use nmcli instead"""
+    global _dbus_bus, _dbus_loop, _dbus_failed
+
+    if MessageBus is None or _dbus_failed:
+        return None
+    with _DBUS_LOCK:
+        if _dbus_bus is None and not _dbus_failed:
+            # dbus-next is asyncio based, so the connection lives on its own
+            # event loop thread and Flask handlers submit calls to it
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+            try:
+                _dbus_bus = asyncio.run_coroutine_threadsafe(
+                    _dbus_connect(), loop
+                ).result(timeout=5)
+                _dbus_loop = loop
+            except Exception as e:
+                print(f"WARNING: D-Bus unavailable, falling back to nmcli: {e}")
+                loop.call_soon_threadsafe(loop.stop)
+                _dbus_failed = True
+        return _dbus_bus
+
+
+async def _dbus_connect():
+    """Connect to the system bus; must run on the D-Bus event loop"""
+    # MessageBus binds to the current event loop when constructed, so it has
+    # to be created on the loop thread rather than the request thread
+    return await MessageBus(bus_type=BusType.SYSTEM).connect()
+
+
+def _dbus_run(coro, timeout=15):
+    """Run a coroutine on the D-Bus event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _dbus_loop).result(timeout=timeout)
+
+
+async def _nm_call(bus, path, interface, member, signature='', body=None):
+    """Call a NetworkManager method and return the reply body"""
+    reply = await bus.call(Message(
+        destination=NM_BUS_NAME,
+        path=path,
+        interface=interface,
+        member=member,
+        signature=signature,
+        body=body or []
+    ))
+    if reply.message_type == MessageType.ERROR:
+        raise RuntimeError(f"{reply.error_name}: {reply.body[0] if reply.body else ''}")
+    return reply.body
+
+
+async def _nm_get_all(bus, path, interface):
+    """Fetch all properties of a NetworkManager object as plain values"""
+    props, = await _nm_call(
+        bus, path, 'org.freedesktop.DBus.Properties', 'GetAll', 's', [interface]
+    )
+    return {name: variant.value for name, variant in props.items()}
+
+
+async def _nm_wifi_devices(bus):
+    """Return the object paths of all wireless devices"""
+    devices, = await _nm_call(bus, NM_PATH, NM_IFACE, 'GetDevices')
+    props = await asyncio.gather(
+        *(_nm_get_all(bus, device, NM_IFACE + '.Device') for device in devices)
+    )
+    return [
+        device for device, p in zip(devices, props)
+        if p['DeviceType'] == NM_DEVICE_TYPE_WIFI
+    ]
+
+
+def get_available_networks(rescan=False):
+    """List available WiFi networks, reusing recent results unless rescan is set"""
+    with _SCAN_LOCK:
+        if (not rescan and _SCAN_CACHE["ts"]
+                and time.monotonic() - _SCAN_CACHE["ts"] < _SCAN_TTL):
+            return _SCAN_CACHE["data"]
+
+        # Join a scan that is already running, unless a fresh radio scan
+        # was asked for and the running one only lists cached results
+        future = _SCAN_INFLIGHT["future"]
+        if future is not None and (_SCAN_INFLIGHT["rescan"] or not rescan):
+            owner = False
+        else:
+            future = Future()
+            _SCAN_INFLIGHT["future"] = future
+            _SCAN_INFLIGHT["rescan"] = rescan
+            owner = True
+
+    if not owner:
+        try:
+            return future.result(timeout=_SCAN_JOIN_TIMEOUT)
+        except FutureTimeoutError:
+            return _SCAN_CACHE["data"] or {'ssids': [], 'signals': [], 'secured': []}
+
+    try:
+        networks = _scan_networks(rescan=rescan)
+    except Exception as e:
+        with _SCAN_LOCK:
+            if _SCAN_INFLIGHT["future"] is future:
+                _SCAN_INFLIGHT["future"] = None
+        future.set_exception(e)
+        raise
+
+    with _SCAN_LOCK:
+        _SCAN_CACHE["data"] = networks
+        _SCAN_CACHE["ts"] = time.monotonic()
+        if _SCAN_INFLIGHT["future"] is future:
+            _SCAN_INFLIGHT["future"] = None
+    future.set_result(networks)
+    return networks
+
 
-    networks = []
-    seen_ssids = set()
+def _scan_networks(rescan=False, limit=SCAN_RESULT_LIMIT):
+    """Collect the strongest visible WiFi networks, strongest first
+
+    Returned as parallel lists ({'ssids', 'signals', 'secured'}) rather than
+    one object per network, which keeps the JSON sent to the portal small.
+    """
+    rows = None
+    bus = _get_dbus()
+    if bus is not None:
+        try:
+            if rescan:
+                _dbus_run(_dbus_request_scan(bus))
+            rows = _dbus_run(_dbus_scan_rows(bus))
+        except Exception as e:
+            print(f"WARNING: D-Bus scan failed, falling back to nmcli: {e}")
+    if rows is None:
+        rows = _nmcli_scan_rows(rescan=rescan)
+
+    # One entry per SSID, keeping the strongest access point that carries it
+    seen = {}
+
+    for row in rows:
+        ssid, signal, _ = row
+        # Skip empty SSID and networks too weak to join
+        if signal <= SCAN_MIN_SIGNAL or not ssid or ssid == "--":
+            continue
+        existing = seen.get(ssid)
+        if existing is None or signal > existing[1]:
+            seen[ssid] = row
+
+    # Keep the strongest networks, sorted by signal strength
+    networks = heapq.nlargest(limit, seen.values(), key=itemgetter(1))
+    return {
+        'ssids': [ssid for ssid, _, _ in networks],
+        'signals': [signal for _, signal, _ in networks],
+        'secured': [secured for _, _, secured in networks]
+    }
+
+
+def _nmcli_scan_rows(rescan=False):
+    """Run nmcli and parse (ssid, signal, secured) rows, signal as an int"""
+    # Without --rescan yes nmcli returns NetworkManager's last results
+    # instead of waiting for a new radio scan
+    code, stdout, stderr = run_command(
+        ["nmcli", "-t", "-f", "SSID,SIGNAL,SECURITY", "device", "wifi", "list",
+         "--rescan", "yes" if rescan else "no"]
+    )
 
+    rows = []
     if code == 0:
-        for line in stdout.strip().split('\n'):
-            if not line:
-                continue
-            parts = line.split(':')
+        for parts in _parse_terse(stdout):
             if len(parts) >= 2:
                 ssid = parts[0]
                 signal = parts[1] if len(parts) > 1 else "0"
                 security = parts[2] if len(parts) > 2 else ""
-
-                # Skip empty SSID and duplicates
-                if ssid and ssid not in seen_ssids and ssid != "--":
-                    networks.append({
-                        'ssid': ssid,
-                        'signal': signal,
-                        'secured': bool(security and security != '--')
-                    })
-                    seen_ssids.add(ssid)
-
-    # Sort by signal strength
-    networks.sort(key=lambda x: int(x['signal']) if x['signal'].isdigit() else 0, reverse=True)
-    return networks
+                rows.append((
+                    ssid,
+                    int(signal) if signal.isdigit() else 0,
+                    bool(security and security != '--')
+                ))
+    return rows
+
+
+async def _dbus_request_scan(bus):
+    """Ask every wireless device for a new scan and wait until it finishes"""
+    wireless = NM_IFACE + '.Device.Wireless'
+    pending = {}
+    for device in await _nm_wifi_devices(bus):
+        props = await _nm_get_all(bus, device, wireless)
+        try:
+            await _nm_call(bus, device, wireless, 'RequestScan', 'a{sv}', [{}])
+        except RuntimeError as e:
+            # e.g. the radio is busy or serving the setup AP; use last results
+            print(f"WARNING: Rescan request failed on {device}: {e}")
+            continue
+        pending[device] = props['LastScan']
+
+    deadline = time.monotonic() + SCAN_WAIT_TIMEOUT
+    while pending and time.monotonic() < deadline:
+        await asyncio.sleep(0.5)
+        for device, last_scan in list(pending.items()):
+            props = await _nm_get_all(bus, device, wireless)
+            if props['LastScan'] != last_scan:
+                del pending[device]
+
+
+async def _dbus_scan_rows(bus):
+    """Read (ssid, signal, secured) rows from NetworkManager's access points"""
+    rows = []
+    for device in await _nm_wifi_devices(bus):
+        aps, = await _nm_call(bus, device, NM_IFACE + '.Device.Wireless', 'GetAccessPoints')
+        props = await asyncio.gather(
+            *(_nm_get_all(bus, ap, NM_IFACE + '.AccessPoint') for ap in aps)
+        )
+        for ap in props:
+            ssid = bytes(ap['Ssid']).decode('utf-8', errors='replace')
+            secured = bool(ap['Flags'] & NM_AP_FLAGS_PRIVACY or ap['WpaFlags'] or ap['RsnFlags'])
+            rows.append((ssid, ap['Strength'], secured))
+    return rows
 
 
 def validate_ssid(ssid):
-    """Validate WiFi SSID"""
-    if not ssid or len(ssid) > 32:
+    """Validate WiFi SSID (802.11 allows up to 32 bytes)"""
+    if not ssid or len(ssid.encode('utf-8')) > 32:
         return False
     return True
 
 
 def validate_password(password):
-    """Validate WiFi password"""
+    """Validate WiFi password (WPA passphrases are 8-63 bytes)"""
     if not password:
         return False
-    if len(password) < 8 or len(password) > 63:
+    length = len(password.encode('utf-8'))
+    if length < 8 or length > 63:
         return False
     return True
 
@@ -92,8 +366,13 @@ def index():
 @app.route('/scan')
 def scan_networks():
     """API endpoint to scan for WiFi networks"""
-    networks = get_available_networks()
-    return jsonify({'networks': networks})
+    return jsonify(get_available_networks())
+
+
+@app.route('/rescan', methods=['POST'])
+def rescan_networks():
+    """API endpoint to run a fresh WiFi scan and return its results"""
+    return jsonify(get_available_networks(rescan=True))
 
 
 @app.route('/configure', methods=['POST'])
@@ -109,56 +388,23 @@ def configure_wifi():
         if not validate_ssid(ssid):
             return jsonify({
                 'success': False,
-                'message': 'Invalid SSID. Must be 1-32 characters.'
+                'message': 'Invalid SSID. Must be 1-32 bytes long.'
             }), 400
 
         if not validate_password(password):
             return jsonify({
                 'success': False,
-                'message': 'Invalid password. Must be 8-63 characters.'
+                'message': 'Invalid password. Must be 8-63 bytes long.'
             }), 400
 
         # Build command
-        cmd = f'bash "{CONFIGURE_WIFI_SCRIPT}" "{ssid}" "{password}" 200'
+        cmd = ['bash', CONFIGURE_WIFI_SCRIPT, ssid, password, '200']
         if hidden:
-            cmd += ' --hidden'
+            cmd.append('--hidden')
 
         # Execute configuration in background to avoid blocking
         # This prevents the portal from hanging if connection takes time
-        config_script = f'''#!/bin/bash
-# WiFi configuration background process
-LOG_FILE="/var/log/wifi-config.log"
-
-echo "$(date): Starting WiFi configuration for {ssid}" >> "$LOG_FILE"
-
-# Run configuration
-{cmd} >> "$LOG_FILE" 2>&1
-
-# Wait for connection to establish (give it 30 seconds)
-sleep 30
-
-# Check if connected
-if nmcli -t -f NAME connection show --active | grep -q "{ssid}"; then
-    echo "$(date): Successfully connected to {ssid}" >> "$LOG_FILE"
-    # Connection successful, we can safely disable AP
-    sleep 5
-    nmcli connection down "{AP_CONNECTION_NAME}" 2>/dev/null || true
-    echo "$(date): AP mode disabled" >> "$LOG_FILE"
-else
-    echo "$(date): Failed to connect to {ssid}, keeping AP active" >> "$LOG_FILE"
-fi
-'''
-
-        # Write script to temp file and execute
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.sh', delete=False) as f:
-            f.write(config_script)
-            script_path = f.name
-
-        os.chmod(script_path, 0o755)
-
-        # Start configuration in background
-        subprocess.Popen(['bash', script_path])
+        _start_configuration(cmd, ssid)
 
         return jsonify({
             'success': True,
@@ -172,34 +418,215 @@ fi
         }), 500
 
 
+def _log_config(message):
+    """Append a timestamped line to the WiFi configuration log"""
+    try:
+        with open(CONFIG_LOG_FILE, 'a') as f:
+            f.write(f"{time.strftime('%a %b %d %H:%M:%S %Z %Y')}: {message}\n")
+    except OSError as e:
+        print(f"WARNING: Could not write {CONFIG_LOG_FILE}: {e}")
+
+
+def _start_configuration(cmd, ssid):
+    """Run configure_wifi.sh in the background and schedule the follow-up"""
+    with _CONFIG_LOCK:
+        # A retry replaces whatever an earlier attempt still had pending
+        _CONFIG_STATE["gen"] += 1
+        gen = _CONFIG_STATE["gen"]
+        if _CONFIG_STATE["timer"] is not None:
+            _CONFIG_STATE["timer"].cancel()
+            _CONFIG_STATE["timer"] = None
+
+    _log_config(f"Starting WiFi configuration for {ssid}")
+    # An unwritable log must not stop the configuration from running
+    try:
+        log = open(CONFIG_LOG_FILE, 'a')
+    except OSError as e:
+        print(f"WARNING: Could not write {CONFIG_LOG_FILE}: {e}")
+        log = None
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=log if log is not None else subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    finally:
+        if log is not None:
+            log.close()
+
+    def wait_for_script():
+        proc.wait()
+        # Give the connection time to establish
+        _schedule_config_step(gen, CONNECT_WAIT, _verify_connection, ssid)
+
+    threading.Thread(target=wait_for_script, daemon=True).start()
+
+
+def _schedule_config_step(gen, delay, func, *args):
+    """Run func(gen, *args) after delay unless a newer /configure came in"""
+    with _CONFIG_LOCK:
+        if gen != _CONFIG_STATE["gen"]:
+            return
+        timer = threading.Timer(delay, func, (gen, *args))
+        timer.daemon = True
+        _CONFIG_STATE["timer"] = timer
+        timer.start()
+
+
+def _verify_connection(gen, ssid):
+    """Check the new connection came up before disabling the AP"""
+    code, _, _ = run_command(["nmcli", "connection", "show", "--active", "id", ssid])
+    if code == 0:
+        _log_config(f"Successfully connected to {ssid}")
+        # Connection successful, we can safely disable AP
+        _schedule_config_step(gen, AP_SHUTDOWN_DELAY, _disable_ap)
+    else:
+        _log_config(f"Failed to connect to {ssid}, keeping AP active")
+
+
+def _disable_ap(gen):
+    """Take the setup AP down"""
+    if gen != _CONFIG_STATE["gen"]:
+        return
+    run_command(["nmcli", "connection", "down", AP_CONNECTION_NAME])
+    _log_config("AP mode disabled")
+
+
 @app.route('/status')
 def status():
     """API endpoint to check current WiFi status"""
-    # Check if connected to a WiFi network (not AP mode)
+    _start_status_monitor()
+
+    with _STATUS_LOCK:
+        result = _STATUS_CACHE["data"]
+        gen = _STATUS_CACHE["gen"]
+        if result is not None and time.monotonic() - _STATUS_CACHE["ts"] >= _STATUS_MAX_AGE:
+            result = None
+    if result is None:
+        result = _read_status()
+        with _STATUS_LOCK:
+            if _status_monitor["alive"] and _STATUS_CACHE["gen"] == gen:
+                _STATUS_CACHE["data"] = result
+                _STATUS_CACHE["ts"] = time.monotonic()
+    return jsonify(result)
+
+
+def _start_status_monitor():
+    """Start following `nmcli monitor` in the background, once per process"""
+    with _STATUS_LOCK:
+        if _status_monitor["started"]:
+            return
+        _status_monitor["started"] = True
+
+    try:
+        proc = subprocess.Popen(
+            ["nmcli", "monitor"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+    except OSError as e:
+        print(f"WARNING: Could not start nmcli monitor, status will not be cached: {e}")
+        return
+
+    _status_monitor["alive"] = True
+    threading.Thread(target=_pump_status_events, args=(proc,), daemon=True).start()
+
+
+def _pump_status_events(proc):
+    """Drop the cached status whenever NetworkManager reports a change"""
+    for _ in proc.stdout:
+        with _STATUS_LOCK:
+            _STATUS_CACHE["gen"] += 1
+            _STATUS_CACHE["data"] = None
+
+    # Without the monitor the cache can't be trusted any more
+    with _STATUS_LOCK:
+        _status_monitor["alive"] = False
+        _STATUS_CACHE["data"] = None
+    proc.wait()
+    print("WARNING: nmcli monitor exited, status will not be cached")
+
+
+def _read_status():
+    """Query the current WiFi status from NetworkManager"""
+    result = None
+    bus = _get_dbus()
+    if bus is not None:
+        try:
+            result = _dbus_run(_dbus_status(bus))
+        except Exception as e:
+            print(f"WARNING: D-Bus status failed, falling back to nmcli: {e}")
+    if result is None:
+        result = _nmcli_status()
+    return result
+
+
+def _nmcli_status():
+    """Read the active WiFi connection via a single nmcli call"""
+    # One terse block of GENERAL.* / IP4.* lines per device
     code, stdout, _ = run_command(
-        "nmcli -t -f TYPE,STATE connection show --active | grep '802-11-wireless:activated'"
+        ["nmcli", "-t", "-f", "GENERAL.TYPE,GENERAL.STATE,GENERAL.CONNECTION,IP4.ADDRESS",
+         "device", "show"]
     )
 
     if code == 0:
-        # Get connection details
-        code, stdout, _ = run_command(
-            "nmcli -t -f NAME,IP4.ADDRESS connection show --active | grep '802-11-wireless'"
-        )
-        if code == 0:
-            lines = stdout.strip().split('\n')
-            if lines:
-                parts = lines[0].split(':')
-                return jsonify({
+        devices = []
+        for parts in _parse_terse(stdout):
+            if len(parts) < 2:
+                continue
+            key, value = parts[0], parts[1]
+            if key == 'GENERAL.TYPE':
+                devices.append({})
+            if devices:
+                # IP4.ADDRESS[1], IP4.ADDRESS[2], ... keep the first address
+                devices[-1].setdefault(key.split('[')[0], value)
+
+        # Check if connected to a WiFi network (state 100 = activated)
+        for device in devices:
+            if (device.get('GENERAL.TYPE') == 'wifi'
+                    and device.get('GENERAL.STATE', '').startswith('100')):
+                return {
                     'connected': True,
-                    'ssid': parts[0] if len(parts) > 0 else 'Unknown',
-                    'ip': parts[1] if len(parts) > 1 else 'N/A'
-                })
+                    'ssid': device.get('GENERAL.CONNECTION') or 'Unknown',
+                    'ip': device.get('IP4.ADDRESS') or 'N/A'
+                }
 
-    return jsonify({
+    return {
+        'connected': False,
+        'ssid': None,
+        'ip': None
+    }
+
+
+async def _dbus_status(bus):
+    """Read the active WiFi connection from NetworkManager"""
+    props = await _nm_get_all(bus, NM_PATH, NM_IFACE)
+    for path in props['ActiveConnections']:
+        conn = await _nm_get_all(bus, path, NM_IFACE + '.Connection.Active')
+        if (conn['Type'] != '802-11-wireless'
+                or conn['State'] != NM_ACTIVE_CONNECTION_STATE_ACTIVATED):
+            continue
+
+        ip = 'N/A'
+        if conn['Ip4Config'] != '/':
+            ip4 = await _nm_get_all(bus, conn['Ip4Config'], NM_IFACE + '.IP4Config')
+            if ip4['AddressData']:
+                address = ip4['AddressData'][0]
+                ip = f"{address['address'].value}/{address['prefix'].value}"
+
+        return {
+            'connected': True,
+            'ssid': conn['Id'] or 'Unknown',
+            'ip': ip
+        }
+
+    return {
         'connected': False,
         'ssid': None,
         'ip': None
-    })
+    }
 
 
 @app.route('/generate_204')
@@ -219,4 +646,6 @@ if __name__ == '__main__':
 
     # Run Flask server
     # Bind to all interfaces on port 80 (requires root)
-    app.run(host='0.0.0.0', port=80, debug=False)
+    # Each request gets its own thread, so a slow scan or status check
+    # doesn't hold up other clients while nmcli/NetworkManager responds
+    app.run(host='0.0.0.0', port=80, debug=False, threaded=True)
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for the WiFi Configuration Portal
+Served by gunicorn, see systemd/wifi-portal.service
+"""
+
+import os
+
+from app import app, CONFIGURE_WIFI_SCRIPT
+
+# Fail the worker at startup rather than on the first /configure request
+if not os.path.exists(CONFIGURE_WIFI_SCRIPT):
+    raise RuntimeError(f"WiFi configuration script not found at {CONFIGURE_WIFI_SCRIPT}")